@@ -1,6 +1,8 @@
 """Tokenize include expressions."""
 import re
 from typing import Iterator
+from typing import Match
+from typing import Optional
 
 from liquid.exceptions import LiquidSyntaxError
 from liquid.expressions.common import GROUP_IDENTINDEX
@@ -22,7 +24,6 @@ from liquid.token import TOKEN_FLOAT
 from liquid.token import TOKEN_IDENTIFIER
 from liquid.token import TOKEN_IDENTINDEX
 from liquid.token import TOKEN_IDENTSTRING
-from liquid.token import TOKEN_ILLEGAL
 from liquid.token import TOKEN_INTEGER
 from liquid.token import TOKEN_LBRACKET
 from liquid.token import TOKEN_LPAREN
@@ -54,19 +55,16 @@ token_rules = (
     (TOKEN_EQUALS, r"="),
     (TOKEN_NEWLINE, r"\n"),
     (TOKEN_SKIP, r"[ \t\r]+"),
-    (TOKEN_ILLEGAL, r"."),
 )
 
-keywords = frozenset(
-    [
-        TOKEN_TRUE,
-        TOKEN_FALSE,
-        TOKEN_NIL,
-        TOKEN_NULL,
-        TOKEN_EMPTY,
-        TOKEN_BLANK,
-    ]
-)
+keywords = {
+    TOKEN_TRUE: TOKEN_TRUE,
+    TOKEN_FALSE: TOKEN_FALSE,
+    TOKEN_NIL: TOKEN_NIL,
+    TOKEN_NULL: TOKEN_NULL,
+    TOKEN_EMPTY: TOKEN_EMPTY,
+    TOKEN_BLANK: TOKEN_BLANK,
+}
 
 OUTPUT_RE = re.compile(
     "|".join(f"(?P<{name}>{pattern})" for name, pattern in token_rules),
@@ -77,15 +75,16 @@ OUTPUT_RE = re.compile(
 def tokenize(source: str, linenum: int = 1) -> Iterator[Token]:
     """Yield tokens from an output expression."""
     _keywords = keywords
-    for match in OUTPUT_RE.finditer(source):
-        kind = match.lastgroup
-        assert kind is not None
+    match: Optional[Match[str]] = None
+    scanner = OUTPUT_RE.scanner(source)  # type: ignore
+    for match in iter(scanner.match, None):
+        kind: str = match.lastgroup  # type: ignore
 
         value = match.group()
         newlines = value.count("\n")
 
-        if kind == TOKEN_IDENTIFIER and value in _keywords:
-            kind = value
+        if kind == TOKEN_IDENTIFIER:
+            kind = _keywords.get(value, kind)
         elif kind == TOKEN_IDENTINDEX:
             value = match.group(GROUP_IDENTINDEX)
         elif kind == TOKEN_IDENTSTRING:
@@ -98,8 +97,11 @@ def tokenize(source: str, linenum: int = 1) -> Iterator[Token]:
             continue
         elif kind == TOKEN_SKIP:
             continue
-        elif kind == TOKEN_ILLEGAL:
-            raise LiquidSyntaxError(f"unexpected {value!r}", linenum=linenum)
 
         linenum += newlines
         yield (linenum, kind, value)
+
+    # The scanner stops at the first character that does not match a rule.
+    stop = 0 if match is None else match.end()
+    if stop != len(source):
+        raise LiquidSyntaxError(f"unexpected {source[stop]!r}", linenum=linenum)
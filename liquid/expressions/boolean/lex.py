@@ -1,6 +1,8 @@
 """Tokenize boolean liquid expressions."""
 import re
 from typing import Iterator
+from typing import Match
+from typing import Optional
 
 from liquid.exceptions import LiquidSyntaxError
 from liquid.expressions.common import GROUP_IDENTINDEX
@@ -21,7 +23,6 @@ from liquid.token import TOKEN_FLOAT
 from liquid.token import TOKEN_IDENTIFIER
 from liquid.token import TOKEN_IDENTINDEX
 from liquid.token import TOKEN_IDENTSTRING
-from liquid.token import TOKEN_ILLEGAL
 from liquid.token import TOKEN_INTEGER
 from liquid.token import TOKEN_LBRACKET
 from liquid.token import TOKEN_LPAREN
@@ -57,24 +58,21 @@ token_rules = (
     (TOKEN_NEWLINE, r"\n"),
     ("OP", r"[!=<>]{1,2}"),
     (TOKEN_SKIP, r"[ \t\r]+"),
-    (TOKEN_ILLEGAL, r"."),
 )
 
 # Keywords for the standard boolean expression.
 # Excludes `not`.
-keywords = frozenset(
-    [
-        TOKEN_TRUE,
-        TOKEN_FALSE,
-        TOKEN_NIL,
-        TOKEN_NULL,
-        TOKEN_EMPTY,
-        TOKEN_BLANK,
-        TOKEN_AND,
-        TOKEN_OR,
-        TOKEN_CONTAINS,
-    ]
-)
+keywords = {
+    TOKEN_TRUE: TOKEN_TRUE,
+    TOKEN_FALSE: TOKEN_FALSE,
+    TOKEN_NIL: TOKEN_NIL,
+    TOKEN_NULL: TOKEN_NULL,
+    TOKEN_EMPTY: TOKEN_EMPTY,
+    TOKEN_BLANK: TOKEN_BLANK,
+    TOKEN_AND: TOKEN_AND,
+    TOKEN_OR: TOKEN_OR,
+    TOKEN_CONTAINS: TOKEN_CONTAINS,
+}
 
 # Rules for a boolean expression that supports grouping with parentheses.
 paren_token_rules = (
@@ -83,12 +81,10 @@ paren_token_rules = (
 )
 
 # Keywords for a boolean expression that supports logical `not`.
-not_keywords = frozenset(
-    [
-        TOKEN_NOT,
-        *keywords,
-    ]
-)
+not_keywords = {
+    TOKEN_NOT: TOKEN_NOT,
+    **keywords,
+}
 
 OUTPUT_RE = re.compile(
     "|".join(f"(?P<{name}>{pattern})" for name, pattern in token_rules),
@@ -104,15 +100,16 @@ PAREN_TOKENS_RE = re.compile(
 def tokenize(source: str, linenum: int = 1) -> Iterator[Token]:
     """Yield tokens from a boolean expression."""
     _keywords = keywords
-    for match in OUTPUT_RE.finditer(source):
-        kind = match.lastgroup
-        assert kind is not None
+    match: Optional[Match[str]] = None
+    scanner = OUTPUT_RE.scanner(source)  # type: ignore
+    for match in iter(scanner.match, None):
+        kind: str = match.lastgroup  # type: ignore
 
         value = match.group()
         newlines = value.count("\n")
 
-        if kind == TOKEN_IDENTIFIER and value in _keywords:
-            kind = value
+        if kind == TOKEN_IDENTIFIER:
+            kind = _keywords.get(value, kind)
         elif kind == TOKEN_IDENTINDEX:
             value = match.group(GROUP_IDENTINDEX)
         elif kind == TOKEN_IDENTSTRING:
@@ -133,12 +130,15 @@ def tokenize(source: str, linenum: int = 1) -> Iterator[Token]:
             continue
         elif kind == TOKEN_SKIP:
             continue
-        elif kind == TOKEN_ILLEGAL:
-            raise LiquidSyntaxError(f"unexpected {value!r}", linenum=linenum)
 
         linenum += newlines
         yield (linenum, kind, value)
 
+    # The scanner stops at the first character that does not match a rule.
+    stop = 0 if match is None else match.end()
+    if stop != len(source):
+        raise LiquidSyntaxError(f"unexpected {source[stop]!r}", linenum=linenum)
+
 
 def tokenize_with_parens(source: str, linenum: int = 1) -> Iterator[Token]:
     """Yield tokens from a boolean expression.
@@ -147,15 +147,16 @@ def tokenize_with_parens(source: str, linenum: int = 1) -> Iterator[Token]:
     start of a logical group.
     """
     _keywords = not_keywords
-    for match in PAREN_TOKENS_RE.finditer(source):
-        kind = match.lastgroup
-        assert kind is not None
+    match: Optional[Match[str]] = None
+    scanner = PAREN_TOKENS_RE.scanner(source)  # type: ignore
+    for match in iter(scanner.match, None):
+        kind: str = match.lastgroup  # type: ignore
 
         value = match.group()
         newlines = value.count("\n")
 
-        if kind == TOKEN_IDENTIFIER and value in _keywords:
-            kind = value
+        if kind == TOKEN_IDENTIFIER:
+            kind = _keywords.get(value, kind)
         elif kind == TOKEN_RANGE_LITERAL:
             # Yield a TOKEN_RANGE_LITERAL, then yield a TOKEN_LPAREN
             # via the `yield` at the end of this loop.
@@ -181,8 +182,11 @@ def tokenize_with_parens(source: str, linenum: int = 1) -> Iterator[Token]:
             continue
         elif kind == TOKEN_SKIP:
             continue
-        elif kind == TOKEN_ILLEGAL:
-            raise LiquidSyntaxError(f"unexpected {value!r}", linenum=linenum)
 
         linenum += newlines
         yield (linenum, kind, value)
+
+    # The scanner stops at the first character that does not match a rule.
+    stop = 0 if match is None else match.end()
+    if stop != len(source):
+        raise LiquidSyntaxError(f"unexpected {source[stop]!r}", linenum=linenum)
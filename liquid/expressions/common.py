@@ -6,6 +6,8 @@ import sys
 from typing import TYPE_CHECKING
 from typing import Callable
 from typing import Iterator
+from typing import Match
+from typing import Optional
 from typing import Tuple
 from typing import Union
 
@@ -37,7 +39,6 @@ from liquid.token import TOKEN_FLOAT
 from liquid.token import TOKEN_IDENTIFIER
 from liquid.token import TOKEN_IDENTINDEX
 from liquid.token import TOKEN_IDENTSTRING
-from liquid.token import TOKEN_ILLEGAL
 from liquid.token import TOKEN_INTEGER
 from liquid.token import TOKEN_LBRACKET
 from liquid.token import TOKEN_LPAREN
@@ -296,20 +297,17 @@ LITERAL_OR_IDENT_TOKEN_RULES = (
     (TOKEN_COMMA, r","),
     (TOKEN_NEWLINE, r"\n"),
     (TOKEN_SKIP, r"[ \t\r]+"),
-    (TOKEN_ILLEGAL, r"."),
 )
 
-LITERAL_OR_IDENT_KEYWORDS = frozenset(
-    [
-        TOKEN_TRUE,
-        TOKEN_FALSE,
-        TOKEN_NIL,
-        TOKEN_NULL,
-        TOKEN_EMPTY,
-        TOKEN_BLANK,
-        TOKEN_OR,
-    ]
-)
+LITERAL_OR_IDENT_KEYWORDS = {
+    TOKEN_TRUE: TOKEN_TRUE,
+    TOKEN_FALSE: TOKEN_FALSE,
+    TOKEN_NIL: TOKEN_NIL,
+    TOKEN_NULL: TOKEN_NULL,
+    TOKEN_EMPTY: TOKEN_EMPTY,
+    TOKEN_BLANK: TOKEN_BLANK,
+    TOKEN_OR: TOKEN_OR,
+}
 
 LITERAL_OR_IDENT_MAP = {
     TOKEN_IDENTIFIER: _parse_common_identifier,
@@ -334,15 +332,16 @@ LITERAL_OR_IDENT_RE = re.compile(
 def tokenize_common_expression(expr: str, linenum: int = 1) -> Iterator[Token]:
     """Yield tokens from a "common" expression."""
     _keywords = LITERAL_OR_IDENT_KEYWORDS
-    for match in LITERAL_OR_IDENT_RE.finditer(expr):
-        kind = match.lastgroup
-        assert kind is not None
+    match: Optional[Match[str]] = None
+    scanner = LITERAL_OR_IDENT_RE.scanner(expr)  # type: ignore
+    for match in iter(scanner.match, None):
+        kind: str = match.lastgroup  # type: ignore
 
         value = match.group()
         newlines = value.count("\n")
 
-        if kind == TOKEN_IDENTIFIER and value in _keywords:
-            kind = value
+        if kind == TOKEN_IDENTIFIER:
+            kind = _keywords.get(value, kind)
         elif kind == TOKEN_IDENTINDEX:
             value = match.group(GROUP_IDENTINDEX)
         elif kind == TOKEN_IDENTSTRING:
@@ -355,12 +354,15 @@ def tokenize_common_expression(expr: str, linenum: int = 1) -> Iterator[Token]:
             continue
         elif kind == TOKEN_SKIP:
             continue
-        elif kind == TOKEN_ILLEGAL:
-            raise LiquidSyntaxError(f"unexpected {value!r}", linenum=linenum)
 
         linenum += newlines
         yield (linenum, kind, value)
 
+    # The scanner stops at the first character that does not match a rule.
+    stop = 0 if match is None else match.end()
+    if stop != len(expr):
+        raise LiquidSyntaxError(f"unexpected {expr[stop]!r}", linenum=linenum)
+
 
 def parse_common_expression(stream: TokenStream) -> Expression:
     """Parse a string, int, float, range, nil, true, false, blank, empty or identifier.
@@ -1,6 +1,8 @@
 """Tokenize liquid loop expressions."""
 import re
 from typing import Iterator
+from typing import Match
+from typing import Optional
 
 from liquid.exceptions import LiquidSyntaxError
 from liquid.expressions.common import GROUP_IDENTINDEX
@@ -20,13 +22,11 @@ from liquid.token import TOKEN_FLOAT
 from liquid.token import TOKEN_IDENTIFIER
 from liquid.token import TOKEN_IDENTINDEX
 from liquid.token import TOKEN_IDENTSTRING
-from liquid.token import TOKEN_ILLEGAL
 from liquid.token import TOKEN_IN
 from liquid.token import TOKEN_INTEGER
 from liquid.token import TOKEN_LBRACKET
 from liquid.token import TOKEN_LIMIT
 from liquid.token import TOKEN_LPAREN
-from liquid.token import TOKEN_NEWLINE
 from liquid.token import TOKEN_OFFSET
 from liquid.token import TOKEN_PIPE
 from liquid.token import TOKEN_RANGE
@@ -52,21 +52,17 @@ token_rules = (
     (TOKEN_COLON, r":"),
     (TOKEN_COMMA, r","),
     (TOKEN_PIPE, r"\|"),
-    (TOKEN_NEWLINE, r"\n"),
-    (TOKEN_SKIP, r"[ \t\r]+"),
-    (TOKEN_ILLEGAL, r"."),
+    (TOKEN_SKIP, r"[ \t\n\r]+"),
 )
 
-keywords = frozenset(
-    [
-        TOKEN_IN,
-        TOKEN_OFFSET,
-        TOKEN_LIMIT,
-        TOKEN_REVERSED,
-        TOKEN_COLS,
-        TOKEN_CONTINUE,
-    ]
-)
+keywords = {
+    TOKEN_IN: TOKEN_IN,
+    TOKEN_OFFSET: TOKEN_OFFSET,
+    TOKEN_LIMIT: TOKEN_LIMIT,
+    TOKEN_REVERSED: TOKEN_REVERSED,
+    TOKEN_COLS: TOKEN_COLS,
+    TOKEN_CONTINUE: TOKEN_CONTINUE,
+}
 
 OUTPUT_RE = re.compile(
     "|".join(f"(?P<{name}>{pattern})" for name, pattern in token_rules),
@@ -77,29 +73,36 @@ OUTPUT_RE = re.compile(
 def tokenize(source: str, linenum: int = 1) -> Iterator[Token]:
     """Yield tokens from a loop expression."""
     _keywords = keywords
-    for match in OUTPUT_RE.finditer(source):
-        kind = match.lastgroup
-        assert kind is not None
+
+    match: Optional[Match[str]] = None
+    scanner = OUTPUT_RE.scanner(source)  # type: ignore
+    for match in iter(scanner.match, None):
+        kind: str = match.lastgroup  # type: ignore
+
+        # Skipped whitespace includes newlines.
+        if kind == TOKEN_SKIP:
+            linenum += match.group().count("\n")
+            continue
 
         value = match.group()
-        newlines = value.count("\n")
 
-        if kind == TOKEN_IDENTIFIER and value in _keywords:
-            kind = value
+        # Only strings and bracketed indexes can span multiple lines.
+        if kind == TOKEN_IDENTIFIER:
+            kind = _keywords.get(value, kind)
         elif kind == TOKEN_IDENTINDEX:
+            linenum += value.count("\n")
             value = match.group(GROUP_IDENTINDEX)
         elif kind == TOKEN_IDENTSTRING:
+            linenum += value.count("\n")
             kind = TOKEN_IDENTIFIER
             value = match.group(GROUP_IDENTQUOTED)
         elif kind == TOKEN_STRING:
+            linenum += value.count("\n")
             value = match.group(GROUP_QUOTED)
-        elif kind == TOKEN_NEWLINE:
-            linenum += 1
-            continue
-        elif kind == TOKEN_SKIP:
-            continue
-        elif kind == TOKEN_ILLEGAL:
-            raise LiquidSyntaxError(f"unexpected {value!r}", linenum=linenum)
 
-        linenum += newlines
         yield (linenum, kind, value)
+
+    # The scanner stops at the first character that does not match a rule.
+    stop = 0 if match is None else match.end()
+    if stop != len(source):
+        raise LiquidSyntaxError(f"unexpected {source[stop]!r}", linenum=linenum)
@@ -19,9 +19,12 @@ import re
 from functools import lru_cache
 from functools import partial
 from typing import Callable
-from typing import Collection
+from typing import FrozenSet
 from typing import Iterable
 from typing import Iterator
+from typing import List
+from typing import Match
+from typing import Optional
 from typing import Pattern
 from typing import Tuple
 
@@ -43,7 +46,6 @@ from liquid.token import TOKEN_FALSE
 from liquid.token import TOKEN_FLOAT
 from liquid.token import TOKEN_FOR
 from liquid.token import TOKEN_IDENTIFIER
-from liquid.token import TOKEN_ILLEGAL
 from liquid.token import TOKEN_IN
 from liquid.token import TOKEN_INTEGER
 from liquid.token import TOKEN_LBRACKET
@@ -84,6 +86,58 @@ __all__ = (
 IDENTIFIER_PATTERN = r"\w[a-zA-Z0-9_\-]*"
 STRING_PATTERN = r"(?P<quote>[\"'])(?P<quoted>.*?)(?P=quote)"
 
+filtered_expression_keywords = frozenset(
+    [
+        TOKEN_TRUE,
+        TOKEN_FALSE,
+        TOKEN_NIL,
+        TOKEN_NULL,
+        TOKEN_EMPTY,
+        TOKEN_BLANK,
+    ]
+)
+
+boolean_expression_keywords = frozenset(
+    [
+        TOKEN_TRUE,
+        TOKEN_FALSE,
+        TOKEN_NIL,
+        TOKEN_NULL,
+        TOKEN_EMPTY,
+        TOKEN_BLANK,
+        TOKEN_AND,
+        TOKEN_OR,
+        TOKEN_CONTAINS,
+    ]
+)
+
+loop_expression_keywords = frozenset(
+    [
+        TOKEN_IN,
+        TOKEN_OFFSET,
+        TOKEN_LIMIT,
+        TOKEN_REVERSED,
+        TOKEN_COLS,
+        TOKEN_CONTINUE,
+    ]
+)
+
+include_expression_keywords = frozenset(
+    [
+        TOKEN_TRUE,
+        TOKEN_FALSE,
+        TOKEN_NIL,
+        TOKEN_NULL,
+        TOKEN_EMPTY,
+        TOKEN_BLANK,
+        TOKEN_WITH,
+        TOKEN_FOR,
+        TOKEN_AS,
+    ]
+)
+
+paginate_expression_keywords = frozenset([TOKEN_BY])
+
 identifier_rules = (
     (TOKEN_INTEGER, r"\d+"),
     (TOKEN_STRING, STRING_PATTERN),
@@ -91,9 +145,7 @@ identifier_rules = (
     (TOKEN_DOT, r"\."),
     (TOKEN_LBRACKET, r"\["),
     (TOKEN_RBRACKET, r"]"),
-    ("NEWLINE", r"\n"),
-    ("SKIP", r"[ \t\r]+"),
-    (TOKEN_ILLEGAL, r"."),
+    ("SKIP", r"[ \t\n\r]+"),
 )
 
 filtered_expression_rules = (
@@ -111,20 +163,7 @@ filtered_expression_rules = (
     (TOKEN_RBRACKET, r"]"),
     (TOKEN_COLON, r":"),
     (TOKEN_PIPE, r"\|"),
-    ("NEWLINE", r"\n"),
-    ("SKIP", r"[ \t\r]+"),
-    (TOKEN_ILLEGAL, r"."),
-)
-
-filtered_expression_keywords = frozenset(
-    [
-        TOKEN_TRUE,
-        TOKEN_FALSE,
-        TOKEN_NIL,
-        TOKEN_NULL,
-        TOKEN_EMPTY,
-        TOKEN_BLANK,
-    ]
+    ("SKIP", r"[ \t\n\r]+"),
 )
 
 assignment_expression_rules = (
@@ -145,24 +184,8 @@ boolean_expression_rules = (
     (TOKEN_LBRACKET, r"\["),
     (TOKEN_RBRACKET, r"]"),
     (TOKEN_COLON, r":"),
-    ("NEWLINE", r"\n"),
     ("OP", r"[!=<>]{1,2}"),
-    ("SKIP", r"[ \t\r]+"),
-    (TOKEN_ILLEGAL, r"."),
-)
-
-boolean_expression_keywords = frozenset(
-    [
-        TOKEN_TRUE,
-        TOKEN_FALSE,
-        TOKEN_NIL,
-        TOKEN_NULL,
-        TOKEN_EMPTY,
-        TOKEN_BLANK,
-        TOKEN_AND,
-        TOKEN_OR,
-        TOKEN_CONTAINS,
-    ]
+    ("SKIP", r"[ \t\n\r]+"),
 )
 
 loop_expression_rules = (
@@ -176,20 +199,7 @@ loop_expression_rules = (
     (TOKEN_LPAREN, r"\("),
     (TOKEN_RPAREN, r"\)"),
     (TOKEN_COLON, r":"),
-    ("NEWLINE", r"\n"),
-    ("SKIP", r"[ \t\r]+"),
-    (TOKEN_ILLEGAL, r"."),
-)
-
-loop_expression_keywords = frozenset(
-    [
-        TOKEN_IN,
-        TOKEN_OFFSET,
-        TOKEN_LIMIT,
-        TOKEN_REVERSED,
-        TOKEN_COLS,
-        TOKEN_CONTINUE,
-    ]
+    ("SKIP", r"[ \t\n\r]+"),
 )
 
 include_expression_rules = (
@@ -206,23 +216,7 @@ include_expression_rules = (
     (TOKEN_LBRACKET, r"\["),
     (TOKEN_RBRACKET, r"]"),
     (TOKEN_COLON, r":"),
-    ("NEWLINE", r"\n"),
-    ("SKIP", r"[ \t\r]+"),
-    (TOKEN_ILLEGAL, r"."),
-)
-
-include_expression_keywords = frozenset(
-    [
-        TOKEN_TRUE,
-        TOKEN_FALSE,
-        TOKEN_NIL,
-        TOKEN_NULL,
-        TOKEN_EMPTY,
-        TOKEN_BLANK,
-        TOKEN_WITH,
-        TOKEN_FOR,
-        TOKEN_AS,
-    ]
+    ("SKIP", r"[ \t\n\r]+"),
 )
 
 
@@ -259,7 +253,7 @@ def compile_liquid_rules(
 
     if not comment_start_string:
         # Do not support shorthand comment syntax
-        literal_pattern = rf".+?(?=(({tag_s}|{stmt_s})(?P<rstrip>-?))|$)"
+        literal_pattern = _literal_pattern(tag_start_string, statement_start_string)
 
         liquid_rules = [
             ("RAW", raw_pattern),
@@ -268,7 +262,9 @@ def compile_liquid_rules(
             (TOKEN_LITERAL, literal_pattern),
         ]
     else:
-        literal_pattern = rf".+?(?=(({tag_s}|{stmt_s}|{comment_s})(?P<rstrip>-?))|$)"
+        literal_pattern = _literal_pattern(
+            tag_start_string, statement_start_string, comment_start_string
+        )
         comment_pattern = rf"{comment_s}(?P<comment>.*?)(?P<rsc>-?){comment_e}"
 
         liquid_rules = [
@@ -282,6 +278,24 @@ def compile_liquid_rules(
     return _compile_rules(liquid_rules)
 
 
+def _literal_pattern(*start_strings: str) -> str:
+    """Return a pattern matching template text up to the next start delimiter.
+
+    Runs of characters that can't start a delimiter are consumed in one step, rather
+    than looking ahead for a delimiter after every character.
+
+    As with a lazy `.+?(?=...|$)` pattern, a literal stops short of a newline at the
+    very end of the template, and that newline becomes a literal of its own.
+    """
+    starts = "|".join(re.escape(s) for s in start_strings)
+    first_chars = "".join(sorted({re.escape(s[0]) for s in start_strings}))
+    return (
+        r"\n\Z|"
+        rf".[^{first_chars}]*(?:(?!{starts})[{first_chars}][^{first_chars}]*)*"
+        rf"(?=(?:{starts})(?P<rstrip>-?)|\n\Z|\Z(?<!\n))"
+    )
+
+
 def _compile_rules(rules: Iterable[Tuple[str, str]]) -> Pattern[str]:
     """Compile the given rules into a single regular expression."""
     pattern = "|".join(f"(?P<{name}>{pattern})" for name, pattern in rules)
@@ -300,13 +314,40 @@ def _tokenize_liquid_expression(
     comment_start_string: str = "",
 ) -> Iterator[Token]:
     """Tokenize a "liquid" tag expression."""
-    for match in rules.finditer(source):
-        kind = match.lastgroup
-        assert kind is not None
+    for line_num, line in enumerate(source.split("\n"), line_count):
+        stripped = line.strip(" \t\r")
+        if not stripped:
+            continue
+
+        # Most lines are a tag name followed by a space and an optional expression.
+        # Anything else, like comments and tab separated expressions, is left to
+        # the regex rules.
+        name, _, expr = stripped.partition(" ")
+        if name.isalnum():
+            if name == comment_start_string:
+                continue
+
+            yield Token(line_num, TOKEN_TAG, name)
+
+            expr = expr.lstrip(" \t")
+            if expr:
+                yield Token(line_num, TOKEN_EXPRESSION, expr)
+        else:
+            yield from _tokenize_liquid_line(
+                line, rules, line_num, comment_start_string
+            )
 
-        line_num = line_count
-        value = match.group()
-        line_count += value.count("\n")
+
+def _tokenize_liquid_line(
+    line: str,
+    rules: Pattern[str],
+    line_num: int,
+    comment_start_string: str,
+) -> Iterator[Token]:
+    match: Optional[Match[str]] = None
+    scanner = rules.scanner(line)  # type: ignore
+    for match in iter(scanner.match, None):
+        kind: str = match.lastgroup  # type: ignore
 
         if kind == "LIQUID_EXPR":
             name = match.group("name")
@@ -317,12 +358,13 @@ def _tokenize_liquid_expression(
 
             if match.group("expr"):
                 yield Token(line_num, TOKEN_EXPRESSION, match.group("expr"))
-        elif kind == "SKIP":
-            continue
-        else:
-            raise LiquidSyntaxError(
-                f"expected newline delimited tag expressions, found {value!r}"
-            )
+
+    # The scanner stops at the first character that does not match a rule.
+    stop = 0 if match is None else match.end()
+    if stop != len(line):
+        raise LiquidSyntaxError(
+            f"expected newline delimited tag expressions, found {line[stop]!r}"
+        )
 
 
 @lru_cache(maxsize=128)
@@ -340,7 +382,6 @@ def get_liquid_expression_lexer(
                 rf"[ \t]*(?P<name>(\w+|{comment}))[ \t]*(?P<expr>.*?)[ \t\r]*?(\n+|$)",
             ),
             ("SKIP", r"[\r\n]+"),
-            (TOKEN_ILLEGAL, r"."),
         )
     else:
         rules = (
@@ -349,7 +390,6 @@ def get_liquid_expression_lexer(
                 r"[ \t]*(?P<name>#|\w+)[ \t]*(?P<expr>.*?)[ \t\r]*?(\n+|$)",
             ),
             ("SKIP", r"[\r\n]+"),
-            (TOKEN_ILLEGAL, r"."),
         )
     return partial(
         _tokenize_liquid_expression,
@@ -362,15 +402,24 @@ def get_liquid_expression_lexer(
 tokenize_liquid_expression = get_liquid_expression_lexer(comment_start_string="")
 
 
-def _tokenize(
-    source: str, rules: Pattern[str], keywords: Collection[str]
-) -> Iterator[Token]:
-    """Generate tokens from the given source string according to the compiled rules."""
+def _tokenize_list(
+    source: str, rules: Pattern[str], keywords: FrozenSet[str]
+) -> List[Token]:
+    """Return a list of tokens from the given source string and compiled rules."""
+    tokens: List[Token] = []
+    append_token = tokens.append
+    make_token = Token
     line_num = 1
 
-    for match in rules.finditer(source):
-        kind = match.lastgroup
-        assert kind is not None
+    match: Optional[Match[str]] = None
+    scanner = rules.scanner(source)  # type: ignore
+    for match in iter(scanner.match, None):
+        kind: str = match.lastgroup  # type: ignore
+
+        # Skipped whitespace includes newlines.
+        if kind == "SKIP":
+            line_num += match.group().count("\n")
+            continue
 
         value = match.group()
 
@@ -389,104 +438,156 @@ def _tokenize(
                     linenum=line_num,
                 ) from err
 
-        elif kind == "NEWLINE":
-            line_num += 1
-            continue
+        append_token(make_token(line_num, kind, value))
 
-        elif kind == "SKIP":
-            continue
+    # The scanner stops at the first character that does not match a rule.
+    stop = 0 if match is None else match.end()
+    if stop != len(source):
+        raise LiquidSyntaxError(f"unexpected {source[stop]!r}", linenum=line_num)
 
-        elif kind == TOKEN_ILLEGAL:
-            raise LiquidSyntaxError(f"unexpected {value!r}", linenum=line_num)
+    return tokens
 
-        yield Token(line_num, kind, value)
 
+@lru_cache(maxsize=1024)
+def _tokenize_cached(
+    source: str, rules: Pattern[str], keywords: FrozenSet[str]
+) -> Tuple[Token, ...]:
+    """Return a tuple of tokens, cached by source string, rule set and keywords.
 
-tokenize_identifier = partial(
-    _tokenize,
-    rules=_compile_rules(identifier_rules),
-    keywords=(),
-)
+    Templates tend to repeat small expressions, like `forloop.index` or
+    `product.title | upcase`, so we only scan each distinct expression once.
+    Tokens are immutable and can safely be shared between streams.
+    """
+    return tuple(_tokenize_list(source, rules, keywords))
 
-tokenize_loop_expression = partial(
-    _tokenize,
-    rules=_compile_rules(loop_expression_rules),
-    keywords=loop_expression_keywords,
-)
 
-tokenize_filtered_expression = partial(
-    _tokenize,
-    rules=_compile_rules(filtered_expression_rules),
-    keywords=filtered_expression_keywords,
-)
+_IDENTIFIER_RE = _compile_rules(identifier_rules)
+_LOOP_RE = _compile_rules(loop_expression_rules)
+_FILTERED_RE = _compile_rules(filtered_expression_rules)
+_ASSIGNMENT_RE = _compile_rules(assignment_expression_rules)
+_BOOLEAN_RE = _compile_rules(boolean_expression_rules)
+_INCLUDE_RE = _compile_rules(include_expression_rules)
 
-tokenize_assignment_expression = partial(
-    _tokenize,
-    rules=_compile_rules(assignment_expression_rules),
-    keywords=filtered_expression_keywords,
-)
+_NO_KEYWORDS: FrozenSet[str] = frozenset()
 
-tokenize_boolean_expression = partial(
-    _tokenize,
-    rules=_compile_rules(boolean_expression_rules),
-    keywords=boolean_expression_keywords,
-)
 
-tokenize_include_expression = partial(
-    _tokenize,
-    rules=_compile_rules(include_expression_rules),
-    keywords=include_expression_keywords,
-)
+def tokenize_identifier(source: str) -> Iterator[Token]:
+    """Generate tokens from an identifier."""
+    yield from _tokenize_cached(source, _IDENTIFIER_RE, _NO_KEYWORDS)
 
-tokenize_paginate_expression = partial(
-    _tokenize,
-    rules=_compile_rules(identifier_rules),
-    keywords={TOKEN_BY},
-)
+
+def tokenize_loop_expression(source: str) -> Iterator[Token]:
+    """Generate tokens from a loop expression."""
+    yield from _tokenize_cached(source, _LOOP_RE, loop_expression_keywords)
+
+
+def tokenize_filtered_expression(source: str) -> Iterator[Token]:
+    """Generate tokens from an output statement or filtered expression."""
+    yield from _tokenize_cached(source, _FILTERED_RE, filtered_expression_keywords)
+
+
+def tokenize_assignment_expression(source: str) -> Iterator[Token]:
+    """Generate tokens from an assignment expression."""
+    yield from _tokenize_cached(source, _ASSIGNMENT_RE, filtered_expression_keywords)
+
+
+def tokenize_boolean_expression(source: str) -> Iterator[Token]:
+    """Generate tokens from a boolean expression."""
+    yield from _tokenize_cached(source, _BOOLEAN_RE, boolean_expression_keywords)
+
+
+def tokenize_include_expression(source: str) -> Iterator[Token]:
+    """Generate tokens from an `include` or `render` expression."""
+    yield from _tokenize_cached(source, _INCLUDE_RE, include_expression_keywords)
+
+
+def tokenize_paginate_expression(source: str) -> Iterator[Token]:
+    """Generate tokens from a `paginate` expression."""
+    yield from _tokenize_cached(source, _IDENTIFIER_RE, paginate_expression_keywords)
 
 
-def _tokenize_template(source: str, rules: Pattern[str]) -> Iterator[Token]:
+def _template_groups(rules: Pattern[str]) -> Tuple[int, ...]:
+    """Return group numbers used by `_tokenize_template`, in unpacking order.
+
+    Resolving group names once, when the lexer is built, saves a name lookup
+    for every match. Comment groups only exist if comment delimiters are
+    configured, so a missing `rsc` group maps to group zero, which is never
+    consulted without a `COMMENT` match.
+    """
+    index = rules.groupindex
+    return (
+        index["stmt"],
+        index["rss"],
+        index["name"],
+        index["pre"],
+        index["expr"],
+        index["rst"],
+        index.get("rsc", 0),
+        index["raw"],
+        index["rsr_e"],
+        index["rstrip"],
+    )
+
+
+def _tokenize_template(
+    source: str, rules: Pattern[str], groups: Tuple[int, ...]
+) -> Iterator[Token]:
     line_count = 1
     lstrip = False
 
-    for match in rules.finditer(source):
-        kind = match.lastgroup
-        assert kind is not None
+    (
+        stmt_group,
+        rss_group,
+        name_group,
+        pre_group,
+        expr_group,
+        rst_group,
+        rsc_group,
+        raw_group,
+        rsr_e_group,
+        rstrip_group,
+    ) = groups
+
+    scanner = rules.scanner(source)  # type: ignore
+    for match in iter(scanner.match, None):
+        kind: str = match.lastgroup  # type: ignore
 
         line_num = line_count
         value = match.group()
         line_count += value.count("\n")
 
         if kind == TOKEN_STATEMENT:
-            value = match.group("stmt")
-            lstrip = bool(match.group("rss"))
+            value = match.group(stmt_group)
+            lstrip = bool(match.group(rss_group))
 
         elif kind == "TAG":
-            name = match.group("name")
+            name = match.group(name_group)
             yield Token(line_num, TOKEN_TAG, name)
 
             kind = TOKEN_EXPRESSION
-            value = match.group("expr")
+            value = match.group(expr_group)
             # Need to count newlines before and after the tag name.
-            line_num += match.group("pre").count("\n")
-            lstrip = bool(match.group("rst"))
+            line_num += match.group(pre_group).count("\n")
+            lstrip = bool(match.group(rst_group))
 
             if not value:
                 continue
 
         elif kind == "COMMENT":
-            lstrip = bool(match.group("rsc"))
+            lstrip = bool(match.group(rsc_group))
             continue
 
         elif kind == "RAW":
             kind = TOKEN_LITERAL
-            value = match.group("raw")
-            lstrip = bool(match.group("rsr_e"))
+            value = match.group(raw_group)
+            lstrip = bool(match.group(rsr_e_group))
 
         elif kind == TOKEN_LITERAL:
+            # Trim both ends in one call, and one copy, when a literal is
+            # between two whitespace controlled tags.
             if lstrip:
-                value = value.lstrip()
-            if match.group("rstrip"):
+                value = value.strip() if match.group(rstrip_group) else value.lstrip()
+            elif match.group(rstrip_group):
                 value = value.rstrip()
 
             if not value:
@@ -504,7 +605,6 @@ def _tokenize_template(source: str, rules: Pattern[str]) -> Iterator[Token]:
         yield Token(line_num, kind, value)
 
 
-@lru_cache(maxsize=128)
 def get_lexer(
     tag_start_string: str = r"{%",
     tag_end_string: str = r"%}",
@@ -514,6 +614,27 @@ def get_lexer(
     comment_end_string: str = "",
 ) -> Callable[[str], Iterator[Token]]:
     """Return a template lexer using the given tag and statement delimiters."""
+    # Always pass delimiters positionally, so that default, keyword and positional
+    # arguments share one cache entry.
+    return _get_lexer(
+        tag_start_string,
+        tag_end_string,
+        statement_start_string,
+        statement_end_string,
+        comment_start_string,
+        comment_end_string,
+    )
+
+
+@lru_cache(maxsize=128)
+def _get_lexer(
+    tag_start_string: str,
+    tag_end_string: str,
+    statement_start_string: str,
+    statement_end_string: str,
+    comment_start_string: str,
+    comment_end_string: str,
+) -> Callable[[str], Iterator[Token]]:
     rules = compile_liquid_rules(
         tag_start_string,
         tag_end_string,
@@ -522,4 +643,13 @@ def get_lexer(
         comment_start_string,
         comment_end_string,
     )
-    return partial(_tokenize_template, rules=rules)
+    return partial(_tokenize_template, rules=rules, groups=_template_groups(rules))
+
+
+# `get_lexer` used to be decorated with `lru_cache` directly. Keep its cache
+# management functions available.
+get_lexer.cache_info = _get_lexer.cache_info  # type: ignore
+get_lexer.cache_clear = _get_lexer.cache_clear  # type: ignore
+
+# Compile the default template lexer once, when this module is imported.
+get_lexer()
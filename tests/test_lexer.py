@@ -284,6 +284,22 @@ class LiquidLexerTestCase(TestCase):
                     Token(1, TOKEN_EXPRESSION, "this is a comment"),
                 ],
             ),
+            Case(
+                "template literal with delimiter-like characters",
+                "a {b} 50% {\n{{ c }}",
+                [
+                    Token(1, TOKEN_LITERAL, "a {b} 50% {\n"),
+                    Token(2, TOKEN_STATEMENT, "c"),
+                ],
+            ),
+            Case(
+                "trailing newline",
+                "a\nb\n",
+                [
+                    Token(1, TOKEN_LITERAL, "a\nb"),
+                    Token(2, TOKEN_LITERAL, "\n"),
+                ],
+            ),
         ]
 
         self._test(test_cases)
@@ -401,6 +417,24 @@ class LiquidLexerTestCase(TestCase):
                     Token(2, TOKEN_EXPRESSION, "'foo'"),
                 ],
             ),
+            Case(
+                "whitespace only lines",
+                "echo 'foo'\n  \t\n\techo 'bar'  ",
+                [
+                    Token(1, TOKEN_TAG, "echo"),
+                    Token(1, TOKEN_EXPRESSION, "'foo'"),
+                    Token(3, TOKEN_TAG, "echo"),
+                    Token(3, TOKEN_EXPRESSION, "'bar'"),
+                ],
+            ),
+            Case(
+                "tab separated expression",
+                "echo\t'foo'",
+                [
+                    Token(1, TOKEN_TAG, "echo"),
+                    Token(1, TOKEN_EXPRESSION, "'foo'"),
+                ],
+            ),
         ]
 
         for case in test_cases:
@@ -1107,3 +1141,66 @@ class LiquidLexerTestCase(TestCase):
 
                 for got, want in zip(tokens, case.expect):
                     self.assertEqual(got, want)
+
+    def test_lex_repeated_expression(self):
+        """Test that we can tokenize the same expression more than once."""
+        source = "product.title | upcase"
+        want = [
+            Token(1, TOKEN_IDENTIFIER, "product"),
+            Token(1, TOKEN_DOT, "."),
+            Token(1, TOKEN_IDENTIFIER, "title"),
+            Token(1, TOKEN_PIPE, "|"),
+            Token(1, TOKEN_IDENTIFIER, "upcase"),
+        ]
+
+        first = tokenize_filtered_expression(source)
+        second = tokenize_filtered_expression(source)
+
+        # Each call gets its own iterator, even if tokens are shared.
+        self.assertEqual(next(first), want[0])
+        self.assertEqual(list(second), want)
+        self.assertEqual(list(first), want[1:])
+
+    def test_lex_errors_are_raised_when_iterating(self):
+        """Test that expression lexing errors are deferred until iteration."""
+        tokens = tokenize_boolean_expression("a $ b")
+        with self.assertRaises(LiquidSyntaxError):
+            list(tokens)
+
+    def test_get_default_lexer(self):
+        """Test that default, positional and keyword delimiters share a lexer."""
+        lexer = get_lexer()
+        self.assertIs(get_lexer("{%", "%}", "{{", "}}"), lexer)
+        self.assertIs(get_lexer("{%", "%}", "{{", "}}", "", ""), lexer)
+        self.assertIs(get_lexer(statement_start_string="{{"), lexer)
+        self.assertIsNot(get_lexer("[%", "%]", "[[", "]]"), lexer)
+
+    def test_clear_lexer_cache(self):
+        """Test that we can inspect and clear the template lexer cache."""
+        get_lexer()
+        self.assertGreater(get_lexer.cache_info().currsize, 0)
+        get_lexer.cache_clear()
+        self.assertEqual(get_lexer.cache_info().currsize, 0)
+        self.assertTrue(callable(get_lexer()))
+
+    def test_lex_identifiers_starting_with_keywords(self):
+        """Test that identifiers are not split on a leading keyword."""
+        self.assertEqual(
+            list(tokenize_loop_expression("item in infinity-stock")),
+            [
+                Token(1, TOKEN_IDENTIFIER, "item"),
+                Token(1, TOKEN_IN, "in"),
+                Token(1, TOKEN_IDENTIFIER, "infinity-stock"),
+            ],
+        )
+
+        self.assertEqual(
+            list(tokenize_boolean_expression("true? and nilly or contains")),
+            [
+                Token(1, TOKEN_IDENTIFIER, "true?"),
+                Token(1, TOKEN_AND, "and"),
+                Token(1, TOKEN_IDENTIFIER, "nilly"),
+                Token(1, TOKEN_OR, "or"),
+                Token(1, TOKEN_CONTAINS, "contains"),
+            ],
+        )